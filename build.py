@@ -1,8 +1,26 @@
 #!/usr/bin/env python3
 """Generates index.html and README.md from resume.yaml."""
 
+import argparse
+import errno
+import hashlib
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
 import yaml
+from collections import deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
 from pathlib import Path
+from urllib.parse import quote
 
 CSS = """\
   *,*::before,*::after{margin:0;padding:0;box-sizing:border-box}
@@ -203,6 +221,96 @@ CSS = """\
     .s{break-inside:avoid}
   }"""
 
+# ── Themes ──
+#
+# A theme is a stylesheet plus a mapping from the logical class names used by
+# the renderers to the class names its stylesheet defines.  Themes are compiled
+# (validated and optionally minified) once, and the compiled form is cached by
+# content hash, so selecting a theme at render time is a dictionary lookup.
+
+DEFAULT_CLASSES = {
+    name: name
+    for name in (
+        "h", "h-name", "h-sub", "h-contact", "d", "h-pos",
+        "s", "s-title",
+        "e", "e-row", "e-org", "e-loc", "e-role", "e-date",
+        "b", "proj",
+        "earlier", "earlier-head", "earlier-note",
+        "sk", "sk-l", "sk-v",
+    )
+}
+
+DEFAULT_THEME = "default"
+
+THEMES = {}
+_COMPILED_THEMES = {}
+
+
+def register_theme(name: str, css: str, classes=None, minify: bool = True) -> None:
+    """Compile and register a theme; missing class mappings fall back to the defaults.
+
+    Raises ValueError, leaving the registry unchanged, if the stylesheet is invalid.
+    """
+    classes = {**DEFAULT_CLASSES, **(classes or {})}
+    digest = hashlib.sha256(
+        "\0".join([css, repr(sorted(classes.items())), str(minify)]).encode()
+    ).hexdigest()
+    theme = {"css": css, "classes": classes, "minify": minify, "key": digest}
+    compile_theme(theme)
+    THEMES[name] = theme
+
+
+def validate_css(css: str, classes: dict) -> None:
+    """Raise ValueError if braces are unbalanced or a mapped class is undefined."""
+    depth = 0
+    for ch in re.sub(r"/\*.*?\*/", "", css, flags=re.S):
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth < 0:
+                raise ValueError("Unbalanced '}' in stylesheet")
+    if depth:
+        raise ValueError("Unbalanced '{' in stylesheet")
+    missing = sorted(
+        cls for cls in set(classes.values())
+        if not re.search(rf"\.{re.escape(cls)}(?![\w-])", css)
+    )
+    if missing:
+        raise ValueError(f"Stylesheet does not define classes: {', '.join(missing)}")
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and insignificant whitespace."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def compile_theme(theme: dict) -> dict:
+    """Validate and minify a registered theme, memoised on its content hash."""
+    compiled = _COMPILED_THEMES.get(theme["key"])
+    if compiled is None:
+        validate_css(theme["css"], theme["classes"])
+        css = minify_css(theme["css"]) if theme["minify"] else theme["css"]
+        compiled = {"css": css, "classes": theme["classes"]}
+        _COMPILED_THEMES[theme["key"]] = compiled
+    return compiled
+
+
+def get_theme(name: str = None) -> dict:
+    """Return the compiled theme called *name* (the default theme if None)."""
+    name = name or DEFAULT_THEME
+    if name not in THEMES:
+        raise ValueError(f"Unknown theme: {name!r} (available: {', '.join(sorted(THEMES))})")
+    return compile_theme(THEMES[name])
+
+
+# The default theme is emitted verbatim so index.html stays byte-for-byte stable.
+register_theme(DEFAULT_THEME, CSS, minify=False)
+
 
 def html_escape(text: str) -> str:
     """Escape &, <, > for HTML, then convert thin spaces to HTML entities."""
@@ -211,85 +319,91 @@ def html_escape(text: str) -> str:
     return text
 
 
-def render_bullet(b) -> str:
+def render_bullet(b, classes=DEFAULT_CLASSES) -> str:
     if isinstance(b, str):
         return f"      <li>{html_escape(b)}</li>"
     heading = html_escape(b["heading"])
     text = html_escape(b["text"])
-    return f'      <li class="proj"><strong>{heading}</strong> {text}</li>'
+    return f'      <li class="{classes["proj"]}"><strong>{heading}</strong> {text}</li>'
 
 
-def render_bullets(bullets) -> str:
-    items = "\n".join(render_bullet(b) for b in bullets)
-    return f"    <ul class=\"b\">\n{items}\n    </ul>"
+def render_bullets(bullets, classes=DEFAULT_CLASSES) -> str:
+    items = "\n".join(render_bullet(b, classes) for b in bullets)
+    return f'    <ul class="{classes["b"]}">\n{items}\n    </ul>'
 
 
-def render_experience_full(entry) -> str:
+def render_experience_full(entry, classes=DEFAULT_CLASSES) -> str:
+    c = classes
     lines = []
-    lines.append('  <div class="e">')
-    lines.append('    <div class="e-row">')
-    lines.append(f'      <span class="e-org">{html_escape(entry["company"])}</span>')
-    lines.append(f'      <span class="e-loc">{html_escape(entry["location"])}</span>')
+    lines.append(f'  <div class="{c["e"]}">')
+    lines.append(f'    <div class="{c["e-row"]}">')
+    lines.append(f'      <span class="{c["e-org"]}">{html_escape(entry["company"])}</span>')
+    lines.append(f'      <span class="{c["e-loc"]}">{html_escape(entry["location"])}</span>')
     lines.append("    </div>")
-    lines.append('    <div class="e-row">')
-    lines.append(f'      <span class="e-role">{html_escape(entry["role"])}</span>')
-    lines.append(f'      <span class="e-date">{html_escape(entry["dates"])}</span>')
+    lines.append(f'    <div class="{c["e-row"]}">')
+    lines.append(f'      <span class="{c["e-role"]}">{html_escape(entry["role"])}</span>')
+    lines.append(f'      <span class="{c["e-date"]}">{html_escape(entry["dates"])}</span>')
     lines.append("    </div>")
-    lines.append(render_bullets(entry["bullets"]))
+    lines.append(render_bullets(entry["bullets"], c))
     lines.append("  </div>")
     return "\n".join(lines)
 
 
-def render_experience_earlier(entry) -> str:
+def render_experience_earlier(entry, classes=DEFAULT_CLASSES) -> str:
+    c = classes
     company = html_escape(entry["company"])
     role = html_escape(entry["role"])
     dates = html_escape(entry["dates"])
     note = html_escape(entry["note"])
     lines = []
-    lines.append('  <div class="earlier">')
-    lines.append(f'    <div class="earlier-head"><strong>{company}</strong> \u00b7 {role} \u00b7 {dates}</div>')
-    lines.append(f'    <div class="earlier-note">{note}</div>')
+    lines.append(f'  <div class="{c["earlier"]}">')
+    lines.append(f'    <div class="{c["earlier-head"]}"><strong>{company}</strong> \u00b7 {role} \u00b7 {dates}</div>')
+    lines.append(f'    <div class="{c["earlier-note"]}">{note}</div>')
     lines.append("  </div>")
     return "\n".join(lines)
 
 
-def render_education(entry) -> str:
+def render_education(entry, classes=DEFAULT_CLASSES) -> str:
+    c = classes
     lines = []
-    lines.append('  <div class="e">')
-    lines.append('    <div class="e-row">')
-    lines.append(f'      <span class="e-org">{html_escape(entry["institution"])}</span>')
-    lines.append(f'      <span class="e-loc">{html_escape(entry["location"])}</span>')
+    lines.append(f'  <div class="{c["e"]}">')
+    lines.append(f'    <div class="{c["e-row"]}">')
+    lines.append(f'      <span class="{c["e-org"]}">{html_escape(entry["institution"])}</span>')
+    lines.append(f'      <span class="{c["e-loc"]}">{html_escape(entry["location"])}</span>')
     lines.append("    </div>")
-    lines.append('    <div class="e-row">')
-    lines.append(f'      <span class="e-role">{html_escape(entry["degree"])}</span>')
-    lines.append(f'      <span class="e-date">{html_escape(entry["dates"])}</span>')
+    lines.append(f'    <div class="{c["e-row"]}">')
+    lines.append(f'      <span class="{c["e-role"]}">{html_escape(entry["degree"])}</span>')
+    lines.append(f'      <span class="{c["e-date"]}">{html_escape(entry["dates"])}</span>')
     lines.append("    </div>")
-    lines.append(render_bullets(entry["bullets"]))
+    lines.append(render_bullets(entry["bullets"], c))
     lines.append("  </div>")
     return "\n".join(lines)
 
 
-def render_skills(skills) -> str:
+def render_skills(skills, classes=DEFAULT_CLASSES) -> str:
     lines = []
     for s in skills:
-        lines.append(f'    <span class="sk-l">{html_escape(s["label"])}</span>')
-        lines.append(f'    <span class="sk-v">{html_escape(s["value"])}</span>')
+        lines.append(f'    <span class="{classes["sk-l"]}">{html_escape(s["label"])}</span>')
+        lines.append(f'    <span class="{classes["sk-v"]}">{html_escape(s["value"])}</span>')
     return "\n".join(lines)
 
 
-def render_html(data: dict) -> str:
+def render_html(data: dict, theme: str = None) -> str:
+    """Render the resume as HTML using *theme*, else data["theme"], else the default."""
+    compiled = get_theme(theme or data.get("theme"))
+    c = compiled["classes"]
     contact = data["contact"]
 
     experience_blocks = []
     for entry in data["experience"]:
         if entry.get("earlier"):
-            experience_blocks.append(render_experience_earlier(entry))
+            experience_blocks.append(render_experience_earlier(entry, c))
         else:
-            experience_blocks.append(render_experience_full(entry))
+            experience_blocks.append(render_experience_full(entry, c))
 
     education_blocks = []
     for entry in data["education"]:
-        education_blocks.append(render_education(entry))
+        education_blocks.append(render_education(entry, c))
 
     parts = []
     name = html_escape(data["name"])
@@ -313,37 +427,37 @@ def render_html(data: dict) -> str:
 <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
 <link href="https://fonts.googleapis.com/css2?family=Lato:ital,wght@0,300;0,400;0,700;0,900;1,300;1,400&display=swap" rel="stylesheet">
 <style>""")
-    parts.append(CSS)
+    parts.append(compiled["css"])
     parts.append("""\
 </style>
 </head>
 <body>
 
-<!-- ══════════════ HEADER ══════════════ -->
-<header class="h">""")
-    parts.append(f'  <div class="h-name">{name}</div>')
-    parts.append(f'  <div class="h-sub">{html_escape(data["location"])}</div>')
+<!-- ══════════════ HEADER ══════════════ -->""")
+    parts.append(f'<header class="{c["h"]}">')
+    parts.append(f'  <div class="{c["h-name"]}">{name}</div>')
+    parts.append(f'  <div class="{c["h-sub"]}">{html_escape(data["location"])}</div>')
 
     github = html_escape(contact["github"])
     linkedin = html_escape(contact["linkedin"])
     contact_line = (
-        f'  <div class="h-contact">\n'
+        f'  <div class="{c["h-contact"]}">\n'
         f'    <a href="https://{contact["github"]}">{github}</a>\n'
-        f'    <span class="d">\u00b7</span>\n'
+        f'    <span class="{c["d"]}">\u00b7</span>\n'
         f'    <a href="https://www.{contact["linkedin"]}">{linkedin}</a>\n'
         f'  </div>'
     )
     parts.append(contact_line)
     parts.append(
-        f'  <div class="h-pos">{summary}</div>'
+        f'  <div class="{c["h-pos"]}">{summary}</div>'
     )
     parts.append("</header>")
 
     # Experience
     parts.append("")
     parts.append("<!-- ══════════════ EXPERIENCE ══════════════ -->")
-    parts.append('<section class="s">')
-    parts.append('  <div class="s-title">Experience</div>')
+    parts.append(f'<section class="{c["s"]}">')
+    parts.append(f'  <div class="{c["s-title"]}">Experience</div>')
     parts.append("")
     parts.append(("\n\n").join(experience_blocks))
     parts.append("</section>")
@@ -351,18 +465,18 @@ def render_html(data: dict) -> str:
     # Education
     parts.append("")
     parts.append("<!-- ══════════════ EDUCATION ══════════════ -->")
-    parts.append('<section class="s">')
-    parts.append('  <div class="s-title">Education</div>')
+    parts.append(f'<section class="{c["s"]}">')
+    parts.append(f'  <div class="{c["s-title"]}">Education</div>')
     parts.append("\n".join(education_blocks))
     parts.append("</section>")
 
     # Skills
     parts.append("")
     parts.append("<!-- ══════════════ SKILLS ══════════════ -->")
-    parts.append('<section class="s">')
-    parts.append('  <div class="s-title">Skills &amp; Interests</div>')
-    parts.append('  <div class="sk">')
-    parts.append(render_skills(data["skills"]))
+    parts.append(f'<section class="{c["s"]}">')
+    parts.append(f'  <div class="{c["s-title"]}">Skills &amp; Interests</div>')
+    parts.append(f'  <div class="{c["sk"]}">')
+    parts.append(render_skills(data["skills"], c))
     parts.append("  </div>")
     parts.append("</section>")
 
@@ -431,19 +545,951 @@ def render_md(data: dict) -> str:
     return "\n".join(lines)
 
 
-def main():
+# ── Schema ──
+#
+# The resume schema is declarative: a type checks isinstance, a dict describes
+# a mapping whose keys ending in "?" are optional, a one-element list is a list
+# of that item, a tuple is a union, and {"$switch": key, True: ..., False: ...}
+# picks a spec by the truthiness of value[key].  compile_schema turns a spec
+# into nested closures once, so validation does no schema interpretation.
+
+BULLET_SCHEMA = (str, {"heading": str, "text": str})
+
+RESUME_SCHEMA = {
+    "name": str,
+    "location": str,
+    "pages_url?": str,
+    "theme?": str,
+    "contact": {"github": str, "linkedin": str},
+    "summary": str,
+    "experience": [{
+        "$switch": "earlier",
+        False: {
+            "company": str, "location": str, "role": str, "dates": str,
+            "earlier?": bool, "bullets": [BULLET_SCHEMA],
+        },
+        True: {"company": str, "role": str, "dates": str, "earlier": bool, "note": str},
+    }],
+    "education": [{
+        "institution": str, "location": str, "degree": str, "dates": str, "bullets": [str],
+    }],
+    "skills": [{"label": str, "value": str}],
+}
+
+_TYPE_NAMES = {
+    str: "string", bool: "boolean", int: "integer", float: "number",
+    dict: "mapping", list: "list", type(None): "null",
+}
+
+# Inputs smaller than this are processed serially; a process pool costs more.
+PARALLEL_THRESHOLD = 64
+
+
+def _type_name(value) -> str:
+    return _TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+def _where(path: str) -> str:
+    return path or "<document>"
+
+
+def _compile(spec):
+    """Return (check, kind, description) for *spec*; check(value, path, errors)."""
+    if isinstance(spec, type):
+        desc = _TYPE_NAMES.get(spec, spec.__name__)
+
+        def check(value, path, errors):
+            if not isinstance(value, spec):
+                errors.append(f"{_where(path)}: expected {desc}, got {_type_name(value)}")
+        return check, spec, desc
+
+    if isinstance(spec, list):
+        item, _, _ = _compile(spec[0])
+
+        def check(value, path, errors):
+            if not isinstance(value, list):
+                errors.append(f"{_where(path)}: expected list, got {_type_name(value)}")
+                return
+            for i, v in enumerate(value):
+                item(v, f"{path}[{i}]", errors)
+        return check, list, "list"
+
+    if isinstance(spec, tuple):
+        options = [_compile(s) for s in spec]
+        desc = " or ".join(d for _, _, d in options)
+
+        def check(value, path, errors):
+            # Report against the member of matching type for precise messages.
+            for sub, kind, _ in options:
+                if isinstance(value, kind):
+                    sub(value, path, errors)
+                    return
+            errors.append(f"{_where(path)}: expected {desc}, got {_type_name(value)}")
+        return check, tuple(kind for _, kind, _ in options), desc
+
+    if "$switch" in spec:
+        key = spec["$switch"]
+        when_true, _, _ = _compile(spec[True])
+        when_false, _, _ = _compile(spec[False])
+
+        def check(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append(f"{_where(path)}: expected mapping, got {_type_name(value)}")
+            elif value.get(key):
+                when_true(value, path, errors)
+            else:
+                when_false(value, path, errors)
+        return check, dict, "mapping"
+
+    fields = [(k.rstrip("?"), k.endswith("?"), _compile(v)[0]) for k, v in spec.items()]
+
+    def check(value, path, errors):
+        if not isinstance(value, dict):
+            errors.append(f"{_where(path)}: expected mapping, got {_type_name(value)}")
+            return
+        for key, optional, sub in fields:
+            sub_path = f"{path}.{key}" if path else key
+            if key in value:
+                sub(value[key], sub_path, errors)
+            elif not optional:
+                errors.append(f"{sub_path}: required key is missing")
+    return check, dict, "mapping"
+
+
+def compile_schema(spec):
+    """Compile *spec* into a function returning a list of "path: message" errors."""
+    check, _, _ = _compile(spec)
+
+    def validate(data) -> list:
+        errors = []
+        check(data, "", errors)
+        return errors
+    return validate
+
+
+validate = compile_schema(RESUME_SCHEMA)
+
+
+def load_resume(path):
+    """Load and validate a resume file; returns (data, errors)."""
+    try:
+        with open(path) as f:
+            data = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as e:
+        return None, [f"<document>: {e}"]
+    return data, validate(data)
+
+
+def theme_errors(data: dict, theme: str = None) -> list:
+    """Reject an unregistered theme; *theme* overrides the document's own."""
+    name = theme or data.get("theme") or DEFAULT_THEME
+    if name not in THEMES:
+        source = "--theme" if theme else "theme"
+        return [f"{source}: unknown theme {name!r}"]
+    return []
+
+
+def parallel_map(fn, items, workers=None):
+    """Map *fn* over *items* in a process pool, or serially for small inputs.
+
+    Workers are not forked: callers such as build_corpus may already have
+    render threads running, and forking a multi-threaded process is unsafe.
+    """
+    items = list(items)
+    if workers == 1 or len(items) < PARALLEL_THRESHOLD:
+        return [fn(item) for item in items]
+    workers = workers or os.cpu_count() or 1
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        return list(pool.map(fn, items, chunksize=max(1, len(items) // (4 * workers))))
+
+
+def validate_corpus(paths, workers=None, theme: str = None) -> dict:
+    """Validate resume files in parallel; returns {path: errors} for invalid files.
+
+    As in build_corpus, themes (*theme*, else each document's own) are
+    checked here rather than in the workers.
+    """
+    paths = [str(p) for p in paths]
+    results = parallel_map(load_resume, paths, workers)
+    invalid = {}
+    for path, (data, errors) in zip(paths, results):
+        errors = errors or theme_errors(data, theme)
+        if errors:
+            invalid[path] = errors
+    return invalid
+
+
+# ── Output store ──
+#
+# Generated files are stored once as read-only blobs named by their SHA-256
+# (objects/ab/cdef...), and each published path is a hardlink to its blob, or
+# a copy where hardlinks are unavailable.  A manifest maps published paths to
+# their digest and the device, inode, mtime and size they were published
+# with, so unchanged outputs cost a hash and a stat but no write, and gc() can
+# delete blobs nothing references.  Published files are always replaced by rename,
+# never rewritten in place, since the inode is shared.
+
+STORE_DIR = ".store"
+# os.link failures meaning "hardlinks unavailable here": publish copies instead.
+COPY_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EMLINK}
+
+
+def write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def _file_id(st) -> list:
+    return [st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size]
+
+
+class OutputStore:
+    """Content-addressed blob store backing a tree of published files."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self._manifest_path = self.root / "manifest.json"
+        self._lock = threading.Lock()
+        if self._manifest_path.exists():
+            self.manifest = json.loads(self._manifest_path.read_text())
+        else:
+            self.manifest = {}
+        self.stats = dict.fromkeys(("written", "deduplicated", "unchanged"), 0)
+
+    def blob_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest[2:]
+
+    def put(self, content: bytes) -> str:
+        """Store *content* if it is not already present; returns its digest."""
+        digest = hashlib.sha256(content).hexdigest()
+        blob = self.blob_path(digest)
+        if blob.exists():
+            self._count("deduplicated")
+            return digest
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=blob.parent, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.chmod(tmp, 0o444)
+        # Never replace an existing blob: published hardlinks point at its inode.
+        try:
+            os.link(tmp, blob)
+        except FileExistsError:
+            self._count("deduplicated")
+        else:
+            self._count("written")
+        finally:
+            os.unlink(tmp)
+        return digest
+
+    def publish(self, path, content) -> str:
+        """Atomically make *path* hold *content*, linked to its blob; returns the digest."""
+        if isinstance(content, str):
+            content = content.encode()
+        path = Path(path)
+        key = os.path.abspath(path)
+        digest = hashlib.sha256(content).hexdigest()
+        recorded = self.manifest.get(key)
+        if recorded is not None and recorded[0] == digest:
+            # Only trust the manifest while the path is still the file published
+            # (link or copy); anything else may have replaced it since.
+            try:
+                unchanged = _file_id(os.stat(path)) == recorded[1:]
+            except OSError:
+                unchanged = False
+            if unchanged:
+                self._count("unchanged")
+                return digest
+        self.put(content)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            try:
+                os.link(self.blob_path(digest), tmp)
+            except OSError as e:
+                if e.errno not in COPY_ERRNOS:
+                    raise
+                # Write into a file created here, never through an existing one.
+                fd, name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+                tmp = Path(name)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(content)
+                os.chmod(tmp, 0o444)
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        st = os.stat(path)
+        with self._lock:
+            self.manifest[key] = [digest, *_file_id(st)]
+        return digest
+
+    def unpublish(self, path) -> None:
+        """Delete *path* if this store published it, so gc() can reclaim its blob."""
+        key = os.path.abspath(path)
+        with self._lock:
+            recorded = self.manifest.pop(key, None)
+        if recorded is not None:
+            Path(path).unlink(missing_ok=True)
+
+    def write_outputs(self, outdir: Path, html: str, md: str) -> None:
+        """RenderScheduler sink publishing index.html and README.md."""
+        self.publish(Path(outdir) / "index.html", html)
+        self.publish(Path(outdir) / "README.md", md)
+
+    def save(self) -> None:
+        with self._lock:
+            write_atomic(self._manifest_path, json.dumps(self.manifest))
+
+    def gc(self) -> int:
+        """Forget deleted published paths and remove unreferenced blobs.
+
+        Returns the number of bytes freed.
+        """
+        with self._lock:
+            self.manifest = {k: v for k, v in self.manifest.items() if os.path.exists(k)}
+            live = {recorded[0] for recorded in self.manifest.values()}
+        freed = 0
+        if self.objects.exists():
+            for blob in self.objects.glob("*/*"):
+                if blob.name.startswith(".tmp-"):
+                    continue  # being written by a concurrent put()
+                if blob.parent.name + blob.name not in live:
+                    freed += blob.stat().st_size
+                    blob.unlink()
+        self.save()
+        return freed
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+
+# ── Render scheduling ──
+
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = ("interactive", "bulk")
+
+
+def write_outputs(outdir: Path, html: str, md: str) -> None:
+    write_atomic(Path(outdir) / "index.html", html)
+    write_atomic(Path(outdir) / "README.md", md)
+
+
+class RenderScheduler:
+    """Worker pool rendering resumes into their output directories by priority.
+
+    Interactive jobs are always started before bulk ones.  Each priority class
+    has a bounded queue: submit() blocks while it is full, raising queue.Full
+    if *timeout* expires first.  A queued job is dropped (its future cancelled)
+    when a newer job for the same output directory is admitted, or when its
+    deadline passes before a worker reaches it.  Jobs for one output directory
+    never run concurrently, so a stale render cannot overwrite a newer one.
+    """
+
+    def __init__(self, workers=4, maxsize=(64, 4096), sink=write_outputs,
+                 latency_window=1024):
+        self._sink = sink
+        self._maxsize = maxsize
+        self._cond = threading.Condition()
+        self._queues = (deque(), deque())
+        self._depth = [0, 0]
+        self._pending = {}
+        self._running = set()
+        self._parked = {}
+        self._seq = itertools.count()
+        self._closed = False
+        self._counts = dict.fromkeys(
+            ("submitted", "completed", "failed", "coalesced", "expired"), 0
+        )
+        self._latency = tuple(deque(maxlen=latency_window) for _ in PRIORITY_NAMES)
+        self._threads = [
+            threading.Thread(target=self._run, name=f"render-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, outdir, data: dict, priority: int = BULK, deadline: float = None,
+               timeout: float = None, theme: str = None, sink=None) -> Future:
+        """Queue *data* for rendering into *outdir*; *deadline* is in seconds from now.
+
+        *theme* is passed to render_html, and *sink* overrides the scheduler's
+        sink for this job.  The returned future resolves to outdir once the
+        outputs are written.
+        """
+        now = time.monotonic()
+        key = str(outdir)
+
+        def admissible():
+            # A queued job for the same key in this class frees its slot on replacement.
+            older = self._pending.get(key)
+            return (
+                self._closed
+                or self._depth[priority] < self._maxsize[priority]
+                or (older is not None and older["priority"] == priority)
+            )
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("RenderScheduler is closed")
+            if not self._cond.wait_for(admissible, timeout):
+                raise queue.Full(f"{PRIORITY_NAMES[priority]} queue is full")
+            if self._closed:
+                raise RuntimeError("RenderScheduler is closed")
+            older = self._pending.pop(key, None)
+            if older is not None:
+                self._drop(older, "coalesced")
+            job = {
+                "seq": next(self._seq),
+                "outdir": outdir,
+                "data": data,
+                "theme": theme,
+                "sink": sink or self._sink,
+                "priority": priority,
+                "deadline": None if deadline is None else now + deadline,
+                "enqueued": now,
+                "future": Future(),
+                "live": True,
+            }
+            self._pending[key] = job
+            self._queues[priority].append(job)
+            self._depth[priority] += 1
+            self._counts["submitted"] += 1
+            self._cond.notify_all()
+        return job["future"]
+
+    def metrics(self) -> dict:
+        """Snapshot of queue depths, job counters and per-class latency in seconds."""
+        with self._cond:
+            latency = {}
+            for name, samples in zip(PRIORITY_NAMES, self._latency):
+                ordered = sorted(samples)
+                n = len(ordered)
+                latency[name] = {
+                    "count": n,
+                    "p50": ordered[n // 2] if n else 0.0,
+                    "p95": ordered[min(n - 1, n * 95 // 100)] if n else 0.0,
+                    "max": ordered[-1] if n else 0.0,
+                }
+            return {
+                "depth": dict(zip(PRIORITY_NAMES, self._depth)),
+                **self._counts,
+                "latency": latency,
+            }
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting jobs; workers exit once the queues have drained."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def _drop(self, job: dict, reason: str) -> None:
+        # Called with the lock held, for a job still counted in its queue depth.
+        job["live"] = False
+        self._depth[job["priority"]] -= 1
+        self._counts[reason] += 1
+        job["future"].cancel()
+        self._cond.notify_all()
+
+    def _next_job(self):
+        # Called with the lock held; returns None once closed and drained.
+        while True:
+            for q in self._queues:
+                while q:
+                    job = q.popleft()
+                    if not job["live"]:
+                        continue
+                    key = str(job["outdir"])
+                    if key in self._running:
+                        # Requeued by _finish(); still pending, so it can be coalesced.
+                        self._parked[key] = job
+                        continue
+                    if self._pending.get(key) is job:
+                        del self._pending[key]
+                    if job["deadline"] is not None and time.monotonic() > job["deadline"]:
+                        self._drop(job, "expired")
+                        continue
+                    self._depth[job["priority"]] -= 1
+                    self._running.add(key)
+                    self._cond.notify_all()
+                    return job
+            if self._closed:
+                return None
+            self._cond.wait()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job()
+            if job is None:
+                return
+            future = job["future"]
+            if not future.set_running_or_notify_cancel():
+                self._finish(job, None)
+                continue
+            try:
+                data = job["data"]
+                job["sink"](job["outdir"], render_html(data, job["theme"]), render_md(data))
+            except BaseException as e:
+                outcome = "failed"
+                future.set_exception(e)
+            else:
+                outcome = "completed"
+                future.set_result(job["outdir"])
+            self._finish(job, outcome)
+
+    def _finish(self, job: dict, outcome) -> None:
+        key = str(job["outdir"])
+        with self._cond:
+            self._running.discard(key)
+            parked = self._parked.pop(key, None)
+            if parked is not None and parked["live"]:
+                self._queues[parked["priority"]].appendleft(parked)
+            if outcome is not None:
+                self._counts[outcome] += 1
+                self._latency[job["priority"]].append(time.monotonic() - job["enqueued"])
+            self._cond.notify_all()
+
+
+# ── Corpus ──
+#
+# A corpus is a directory of tenants, each a subdirectory holding resume.yaml
+# and its generated index.html and README.md.  The paginated directory pages
+# listing every tenant are driven by a persisted summary table, so an update
+# only re-reads the YAML of tenants whose file (or theme) changed and only
+# rewrites the pages those tenants sit on.  Each tenant keeps a stable slot,
+# page N holds slots [N * page_size, (N + 1) * page_size), and slots freed by
+# removed tenants are reused by the next ones added.
+
+PAGE_SIZE = 100
+DIRECTORY_DIR = ".directory"
+DIRECTORY_FIELDS = ("name", "location", "role")
+
+
+def page_filename(page: int) -> str:
+    return "directory.html" if page == 0 else f"directory-{page + 1}.html"
+
+
+def summarize(data: dict) -> dict:
+    """Return the directory fields for a resume: name, location, current role."""
+    role = next((e["role"] for e in data["experience"] if not e.get("earlier")), "")
+    return {"name": data["name"], "location": data["location"], "role": role}
+
+
+class DirectoryTable:
+    """The corpus summary table, sharded so an update touches O(changed) data.
+
+    Under root/.directory, index.json holds the page size, slot count and
+    free-slot heap; page-N.json holds the slots and entries of directory page
+    N; and slots-XX.json maps the tenants whose id hashes to XX to their slot.
+    Shards are read on first use and only modified ones are written back.
+    """
+
+    def __init__(self, root, page_size: int = PAGE_SIZE):
+        self.path = Path(root) / DIRECTORY_DIR
+        index = self.path / "index.json"
+        if index.exists():
+            meta = json.loads(index.read_text())
+        else:
+            meta = {"page_size": page_size, "length": 0, "free": []}
+        self.page_size = meta["page_size"]
+        self.length = meta["length"]
+        self.free = meta["free"]
+        self._shards = {}
+        self._dirty = set()
+
+    def __contains__(self, tenant: str) -> bool:
+        return tenant in self._locator(tenant)[1]
+
+    def page_count(self) -> int:
+        return max(1, -(-self.length // self.page_size))
+
+    def get(self, tenant: str):
+        """Return the entry for *tenant*, or None if it is not listed."""
+        slot = self._locator(tenant)[1].get(tenant)
+        if slot is None:
+            return None
+        return self._page(slot // self.page_size)["tenants"][tenant]
+
+    def tenant_ids(self) -> set:
+        """All listed tenants; reads every slots shard."""
+        ids = set()
+        if self.path.exists():
+            for path in self.path.glob("slots-*.json"):
+                ids.update(self._shard(path.name, dict))
+        return ids
+
+    def entries(self, page: int) -> list:
+        shard = self._page(page)
+        return [(t, shard["tenants"][t]) for t in shard["slots"] if t is not None]
+
+    def set(self, tenant: str, fields: dict):
+        """Insert or update *tenant*; returns its page if the listing changed, else None."""
+        name, locator = self._locator(tenant)
+        slot = locator.get(tenant)
+        if slot is None:
+            while self.free and self.free[0] >= self.length:
+                heapq.heappop(self.free)
+            slot = heapq.heappop(self.free) if self.free else self.length
+            self.length = max(self.length, slot + 1)
+            locator[tenant] = slot
+            self._dirty.add(name)
+        page = slot // self.page_size
+        shard = self._page(page)
+        entry = shard["tenants"].get(tenant)
+        if entry is None:
+            slots, i = shard["slots"], slot % self.page_size
+            slots.extend([None] * (i + 1 - len(slots)))
+            slots[i] = tenant
+            changed = True
+        else:
+            changed = any(entry[k] != fields[k] for k in DIRECTORY_FIELDS)
+        shard["tenants"][tenant] = fields
+        self._dirty.add(f"page-{page}.json")
+        return page if changed else None
+
+    def remove(self, tenant: str):
+        """Unlist *tenant*; returns the page it was on, or None if it was not listed."""
+        name, locator = self._locator(tenant)
+        slot = locator.pop(tenant, None)
+        if slot is None:
+            return None
+        self._dirty.add(name)
+        page = slot // self.page_size
+        shard = self._page(page)
+        shard["slots"][slot % self.page_size] = None
+        del shard["tenants"][tenant]
+        self._dirty.add(f"page-{page}.json")
+        heapq.heappush(self.free, slot)
+        while self.length and self._slot(self.length - 1) is None:
+            self.length -= 1
+        return page
+
+    def save(self) -> None:
+        self.path.mkdir(exist_ok=True)
+        for name in sorted(self._dirty):
+            shard = self._shards[name]
+            empty = not shard["tenants"] if name.startswith("page-") else not shard
+            if empty:
+                (self.path / name).unlink(missing_ok=True)
+            else:
+                write_atomic(self.path / name, json.dumps(shard))
+        self._dirty.clear()
+        meta = {"page_size": self.page_size, "length": self.length, "free": self.free}
+        write_atomic(self.path / "index.json", json.dumps(meta))
+
+    def _shard(self, name: str, empty):
+        shard = self._shards.get(name)
+        if shard is None:
+            path = self.path / name
+            shard = json.loads(path.read_text()) if path.exists() else empty()
+            self._shards[name] = shard
+        return shard
+
+    def _page(self, page: int) -> dict:
+        return self._shard(f"page-{page}.json", lambda: {"slots": [], "tenants": {}})
+
+    def _locator(self, tenant: str):
+        name = f"slots-{hashlib.sha1(tenant.encode()).hexdigest()[:2]}.json"
+        return name, self._shard(name, dict)
+
+    def _slot(self, slot: int):
+        slots = self._page(slot // self.page_size)["slots"]
+        i = slot % self.page_size
+        return slots[i] if i < len(slots) else None
+
+
+def scan_corpus(root: Path, table: DirectoryTable, theme: str = None, changed=None):
+    """Return (updated, removed) tenant ids whose resume.yaml differs from *table*.
+
+    A tenant is updated when its file's mtime/size no longer matches the
+    table, or when the theme this run would use (*theme*, else the document's
+    recorded 'theme' field, else the default) differs from the one it was last
+    rendered with, by name or content hash.  *changed* limits the scan to
+    those tenants.
+    """
+    if changed is None:
+        with os.scandir(root) as it:
+            candidates = {e.name for e in it if e.is_dir() and not e.name.startswith(".")}
+        candidates |= table.tenant_ids()
+    else:
+        candidates = set(changed)
+
+    updated, removed = [], []
+    for tenant in sorted(candidates):
+        try:
+            st = (root / tenant / "resume.yaml").stat()
+        except FileNotFoundError:
+            if tenant in table:
+                removed.append(tenant)
+            continue
+        entry = table.get(tenant)
+        if entry is None or entry["stat"] != [st.st_mtime_ns, st.st_size]:
+            updated.append(tenant)
+            continue
+        effective = theme or entry["doc_theme"] or DEFAULT_THEME
+        current = THEMES.get(effective)
+        if (
+            effective != entry["theme"]
+            or current is None
+            or current["key"] != entry["theme_key"]
+        ):
+            updated.append(tenant)
+    return updated, removed
+
+
+def update_directory(
+    root: Path, table: DirectoryTable, updates: dict, store: OutputStore = None,
+) -> list:
+    """Apply *updates* (tenant -> entry, or None to remove) and rewrite affected pages.
+
+    Pages are published through *store* when given.  Returns the page numbers
+    written.
+    """
+    old_pages = table.page_count()
+    dirty = set()
+    for tenant, fields in updates.items():
+        page = table.remove(tenant) if fields is None else table.set(tenant, fields)
+        if page is not None:
+            dirty.add(page)
+
+    new_pages = table.page_count()
+    if new_pages != old_pages:
+        # Only the last page has no "next" link.
+        dirty |= {old_pages - 1, new_pages - 1}
+    for page in range(new_pages, old_pages):
+        (root / page_filename(page)).unlink(missing_ok=True)
+
+    written = sorted(p for p in dirty if p < new_pages)
+    if not (root / page_filename(0)).exists() and 0 not in written:
+        written.insert(0, 0)
+    for page in written:
+        html = render_directory_page(table.entries(page), page, new_pages)
+        if store is not None:
+            store.publish(root / page_filename(page), html)
+        else:
+            write_atomic(root / page_filename(page), html)
+    return written
+
+
+def render_directory_page(entries, page: int, pages: int) -> str:
+    lines = []
+    lines.append("<!DOCTYPE html>")
+    lines.append('<html lang="en">')
+    lines.append("<head>")
+    lines.append('<meta charset="UTF-8">')
+    lines.append('<meta name="viewport" content="width=device-width, initial-scale=1.0">')
+    lines.append(f"<title>Directory - Page {page + 1}</title>")
+    lines.append("</head>")
+    lines.append("<body>")
+    lines.append('<ul class="dir">')
+    for tenant, entry in entries:
+        name = html_escape(entry["name"])
+        details = " \u00b7 ".join(
+            html_escape(entry[k]) for k in ("role", "location") if entry[k]
+        )
+        lines.append(f'  <li><a href="{quote(tenant)}/index.html">{name}</a> \u00b7 {details}</li>')
+    lines.append("</ul>")
+    lines.append("<nav>")
+    if page > 0:
+        lines.append(f'  <a rel="prev" href="{page_filename(page - 1)}">Previous</a>')
+    if page < pages - 1:
+        lines.append(f'  <a rel="next" href="{page_filename(page + 1)}">Next</a>')
+    lines.append("</nav>")
+    lines.append("</body>")
+    lines.append("</html>")
+    return "\n".join(lines) + "\n"
+
+
+def build_corpus(
+    root: Path, theme: str = None, changed=None, page_size: int = PAGE_SIZE, workers=None,
+    scheduler: RenderScheduler = None, store: OutputStore = None,
+) -> dict:
+    """Render changed tenants under *root* and bring the directory pages up to date.
+
+    Changed documents are validated before any rendering; invalid tenants are
+    skipped, keep their previous directory entry, and are reported under
+    "invalid" as {tenant: errors}; tenants whose render raised are likewise
+    reported under "failed".  Renders are queued as bulk jobs on
+    *scheduler* (a private one by default), so a shared scheduler keeps serving
+    interactive saves first.  Tenants whose job was superseded by a newer one
+    are left for the next build to pick up.  Tenant outputs and directory
+    pages are published through *store* (by default one in root/.store), also
+    on a shared scheduler, whose own sink is bypassed for these jobs.  Removed
+    tenants' published outputs are deleted.
+    """
+    root = Path(root)
+    if store is None:
+        store = OutputStore(root / STORE_DIR)
+    table = DirectoryTable(root, page_size)
+    updated, removed = scan_corpus(root, table, theme, changed)
+
+    stats = {tenant: (root / tenant / "resume.yaml").stat() for tenant in updated}
+    loaded = parallel_map(load_resume, [root / t / "resume.yaml" for t in updated], workers)
+    # Themes are checked here, not in the workers, which may not share THEMES.
+    loaded = [(data, errors or theme_errors(data, theme)) for data, errors in loaded]
+    invalid = {t: errors for t, (_, errors) in zip(updated, loaded) if errors}
+
+    own_scheduler = scheduler is None
+    if own_scheduler:
+        scheduler = RenderScheduler(workers=workers or 4)
+    try:
+        jobs = {}
+        for tenant, (data, errors) in zip(updated, loaded):
+            if not errors:
+                theme_name = theme or data.get("theme") or DEFAULT_THEME
+                future = scheduler.submit(
+                    root / tenant, data, BULK, theme=theme_name, sink=store.write_outputs,
+                )
+                jobs[tenant] = (data, theme_name, future)
+        rendered = []
+        failed = {}
+        updates = {tenant: None for tenant in removed}
+        for tenant, (data, theme_name, future) in jobs.items():
+            try:
+                future.result()
+            except CancelledError:
+                continue
+            except Exception as e:
+                failed[tenant] = [f"render failed: {e}"]
+                continue
+            st = stats[tenant]
+            updates[tenant] = {
+                **summarize(data),
+                "stat": [st.st_mtime_ns, st.st_size],
+                "theme": theme_name,
+                "theme_key": THEMES[theme_name]["key"],
+                "doc_theme": data.get("theme"),
+            }
+            rendered.append(tenant)
+    finally:
+        if own_scheduler:
+            scheduler.close()
+
+    pages = update_directory(root, table, updates, store)
+    for tenant in removed:
+        store.unpublish(root / tenant / "index.html")
+        store.unpublish(root / tenant / "README.md")
+    store.save()
+    table.save()
+    return {
+        "rendered": rendered, "removed": removed, "pages": pages,
+        "invalid": invalid, "failed": failed,
+    }
+
+
+def report_errors(errors: dict) -> None:
+    for source, messages in errors.items():
+        for message in messages:
+            print(f"{source}: {message}", file=sys.stderr)
+
+
+def report_store(store: OutputStore, gc: bool) -> None:
+    stats = store.stats
+    print(
+        f"Store: {stats['written']} blobs written, "
+        f"{stats['deduplicated']} deduplicated, {stats['unchanged']} unchanged"
+    )
+    if gc:
+        print(f"Store: freed {store.gc()} bytes")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--theme", choices=sorted(THEMES),
+        help="stylesheet theme (default: resume.yaml 'theme' field, else 'default')",
+    )
+    parser.add_argument(
+        "--corpus", type=Path, metavar="DIR",
+        help="build every tenant under DIR and update its directory pages",
+    )
+    parser.add_argument(
+        "--changed", action="append", metavar="TENANT",
+        help="with --corpus, only check these tenants for changes (repeatable)",
+    )
+    parser.add_argument(
+        "--check", action="store_true",
+        help="only validate resume.yaml (or every tenant with --corpus)",
+    )
+    parser.add_argument(
+        "--workers", type=int, metavar="N",
+        help="corpus validation processes and render threads",
+    )
+    parser.add_argument(
+        "--store", type=Path, metavar="DIR",
+        help="content-addressed output store (default with --corpus: DIR/.store)",
+    )
+    parser.add_argument(
+        "--gc", action="store_true",
+        help="after building, delete store blobs no published file references",
+    )
+    args = parser.parse_args(argv)
+
+    if args.corpus and args.check:
+        paths = sorted(args.corpus.glob("*/resume.yaml"))
+        errors = validate_corpus(paths, args.workers, args.theme)
+        report_errors(errors)
+        print(f"Checked {len(paths)} resumes, {len(errors)} invalid")
+        sys.exit(1 if errors else 0)
+
+    if args.corpus:
+        store = OutputStore(args.store or args.corpus / STORE_DIR)
+        result = build_corpus(
+            args.corpus, theme=args.theme, changed=args.changed, workers=args.workers,
+            store=store,
+        )
+        report_errors(result["invalid"])
+        report_errors(result["failed"])
+        print(
+            f"Rendered {len(result['rendered'])} tenants, "
+            f"removed {len(result['removed'])}, "
+            f"rejected {len(result['invalid'])}, "
+            f"failed {len(result['failed'])}, "
+            f"wrote {len(result['pages'])} directory pages"
+        )
+        report_store(store, args.gc)
+        sys.exit(1 if result["invalid"] or result["failed"] else 0)
+
     root = Path(__file__).resolve().parent
-    with open(root / "resume.yaml") as f:
-        data = yaml.safe_load(f)
+    data, errors = load_resume(root / "resume.yaml")
+    errors = errors or theme_errors(data, args.theme)
+    if errors:
+        report_errors({"resume.yaml": errors})
+        sys.exit(1)
+    if args.check:
+        print("resume.yaml is valid")
+        return
 
-    html = render_html(data)
-    (root / "index.html").write_text(html)
+    store = OutputStore(args.store) if args.store else None
+    publish = store.publish if store else write_atomic
+
+    html = render_html(data, theme=args.theme)
+    publish(root / "index.html", html)
     print("Wrote index.html")
 
     md = render_md(data)
-    (root / "README.md").write_text(md)
+    publish(root / "README.md", md)
     print("Wrote README.md")
 
+    if store:
+        store.save()
+        report_store(store, args.gc)
+
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """Tests for resume build system."""
 
+import errno
+import os
+import queue
 import subprocess
+import threading
 import yaml
 from pathlib import Path
 
@@ -15,6 +19,25 @@ from build import (
     render_skills,
     render_html,
     render_md,
+    CSS,
+    THEMES,
+    register_theme,
+    get_theme,
+    minify_css,
+    validate_css,
+    build_corpus,
+    page_filename,
+    summarize,
+    compile_schema,
+    validate,
+    validate_corpus,
+    theme_errors,
+    RenderScheduler,
+    INTERACTIVE,
+    BULK,
+    OutputStore,
+    STORE_DIR,
+    DIRECTORY_DIR,
 )
 
 ROOT = Path(__file__).resolve().parent
@@ -218,6 +241,67 @@ def test_html_thin_space_rendered():
     assert "20&#8201;GB" in html
 
 
+# ═══════════════════════════════════════════════════════════════
+#  Themes
+# ═══════════════════════════════════════════════════════════════
+
+def test_default_theme_is_verbatim():
+    assert get_theme()["css"] == CSS
+
+def test_theme_compiled_once():
+    assert get_theme("default") is get_theme("default")
+
+def test_minify_css():
+    css = "/* c */\n  .a {\n    color: red;\n    margin:0 auto;\n  }\n"
+    assert minify_css(css) == ".a{color:red;margin:0 auto}"
+
+def test_validate_css_rejects_unbalanced():
+    try:
+        validate_css(".a{color:red", {"a": "a"})
+    except ValueError as e:
+        assert "Unbalanced" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+def test_validate_css_rejects_missing_class():
+    try:
+        validate_css(".a{color:red}", {"a": "a", "b": "b"})
+    except ValueError as e:
+        assert "b" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+def test_theme_class_mapping_and_selection():
+    css = CSS.replace(".e-org", ".org-name")
+    register_theme("test-renamed", css, {"e-org": "org-name"})
+    try:
+        data = load_data()
+        html = render_html(data, theme="test-renamed")
+        assert 'class="org-name"' in html
+        assert 'class="e-org"' not in html
+        assert "/*" not in html  # minified
+        assert render_html({**data, "theme": "test-renamed"}) == html
+    finally:
+        del THEMES["test-renamed"]
+
+def test_broken_theme_rejected_at_registration():
+    try:
+        register_theme("test-broken", ".h{")
+    except ValueError as e:
+        assert "Unbalanced" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+    assert "test-broken" not in THEMES
+
+def test_unknown_theme_rejected():
+    try:
+        render_html(load_data(), theme="no-such-theme")
+    except ValueError as e:
+        assert "no-such-theme" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
 # ═══════════════════════════════════════════════════════════════
 #  YAML schema validation
 # ═══════════════════════════════════════════════════════════════
@@ -253,6 +337,73 @@ def test_yaml_bullets_polymorphic():
     assert has_dict, "Expected at least one heading/text bullet"
 
 
+def test_validate_bundled_resume():
+    assert validate(load_data()) == []
+
+def test_validate_missing_top_level_key():
+    data = load_data()
+    del data["summary"]
+    assert validate(data) == ["summary: required key is missing"]
+
+def test_validate_contact_field_type():
+    data = load_data()
+    data["contact"]["github"] = None
+    assert validate(data) == ["contact.github: expected string, got null"]
+
+def test_validate_earlier_entry_requires_note():
+    data = load_data()
+    del data["experience"][1]["note"]
+    assert validate(data) == ["experience[1].note: required key is missing"]
+
+def test_validate_full_entry_requires_bullets():
+    data = load_data()
+    del data["experience"][0]["bullets"]
+    assert validate(data) == ["experience[0].bullets: required key is missing"]
+
+def test_validate_bullet_shapes():
+    data = load_data()
+    data["experience"][0]["bullets"][1] = {"heading": "H:"}
+    data["experience"][0]["bullets"][2] = 42
+    assert validate(data) == [
+        "experience[0].bullets[1].text: required key is missing",
+        "experience[0].bullets[2]: expected string or mapping, got integer",
+    ]
+
+def test_validate_not_a_mapping():
+    assert validate(["a"]) == ["<document>: expected mapping, got list"]
+
+def test_compile_schema_optional_keys():
+    check = compile_schema({"a": str, "b?": [int]})
+    assert check({"a": "x"}) == []
+    assert check({"a": "x", "b": [1, "2"]}) == ["b[1]: expected integer, got string"]
+
+def test_theme_errors():
+    data = load_data()
+    assert theme_errors(data) == []
+    assert theme_errors({**data, "theme": "fancy"}) == ["theme: unknown theme 'fancy'"]
+    assert theme_errors({**data, "theme": "fancy"}, "default") == []
+
+def test_validate_corpus_reports_bad_files(tmp_path):
+    good = tmp_path / "good.yaml"
+    good.write_text((ROOT / "resume.yaml").read_text())
+    bad = tmp_path / "bad.yaml"
+    bad.write_text("name: [unclosed")
+    empty = tmp_path / "empty.yaml"
+    empty.write_text("name: Someone\n")
+    errors = validate_corpus([good, bad, empty])
+    assert set(errors) == {str(bad), str(empty)}
+    assert "location: required key is missing" in errors[str(empty)]
+
+def test_validate_corpus_parallel_matches_serial(tmp_path):
+    paths = []
+    for i in range(70):
+        path = tmp_path / f"{i}.yaml"
+        path.write_text("name: Someone\n" if i % 7 == 0 else (ROOT / "resume.yaml").read_text())
+        paths.append(path)
+    assert validate_corpus(paths, workers=2) == validate_corpus(paths, workers=1)
+    assert len(validate_corpus(paths, workers=2)) == 10
+
+
 # ═══════════════════════════════════════════════════════════════
 #  Markdown output
 # ═══════════════════════════════════════════════════════════════
@@ -303,6 +454,467 @@ def test_md_earlier_entries_not_h3():
     assert "**Sympli**" in md
 
 
+# ═══════════════════════════════════════════════════════════════
+#  Corpus directory
+# ═══════════════════════════════════════════════════════════════
+
+def _add_tenant(root, tenant, name):
+    (root / tenant).mkdir(exist_ok=True)
+    data = {**load_data(), "name": name}
+    (root / tenant / "resume.yaml").write_text(yaml.safe_dump(data, allow_unicode=True))
+
+def test_summarize_uses_current_role():
+    assert summarize(load_data()) == {
+        "name": "Alexander Sumer",
+        "location": "Sydney, NSW, Australia",
+        "role": "Senior Software Engineer, AI Platform",
+    }
+
+def test_corpus_initial_build(tmp_path):
+    for i in range(5):
+        _add_tenant(tmp_path, f"t{i}", f"Person {i}")
+    result = build_corpus(tmp_path, page_size=2)
+    assert result["rendered"] == ["t0", "t1", "t2", "t3", "t4"]
+    assert result["pages"] == [0, 1, 2]
+    assert (tmp_path / "t3" / "index.html").exists()
+    assert (tmp_path / "t3" / "README.md").exists()
+    first = (tmp_path / page_filename(0)).read_text()
+    assert 'href="t0/index.html">Person 0</a>' in first
+    assert 'rel="next" href="directory-2.html"' in first
+    last = (tmp_path / page_filename(2)).read_text()
+    assert "Person 4" in last
+    assert 'rel="next"' not in last
+
+def test_corpus_noop_rebuild(tmp_path):
+    _add_tenant(tmp_path, "a", "A")
+    build_corpus(tmp_path)
+    result = build_corpus(tmp_path)
+    assert result == {"rendered": [], "removed": [], "pages": [], "invalid": {}, "failed": {}}
+
+def test_corpus_change_rewrites_only_its_page(tmp_path):
+    for i in range(6):
+        _add_tenant(tmp_path, f"t{i}", f"Person {i}")
+    build_corpus(tmp_path, page_size=2)
+    _add_tenant(tmp_path, "t3", "Renamed")
+    result = build_corpus(tmp_path, changed=["t3"])
+    assert result["rendered"] == ["t3"]
+    assert result["pages"] == [1]
+    assert "Renamed" in (tmp_path / page_filename(1)).read_text()
+
+def test_corpus_change_rewrites_only_its_shards(tmp_path):
+    for i in range(6):
+        _add_tenant(tmp_path, f"t{i}", f"Person {i}")
+    build_corpus(tmp_path, page_size=2)
+    table_dir = tmp_path / DIRECTORY_DIR
+    before = {p.name: p.stat().st_ino for p in table_dir.iterdir()}
+    _add_tenant(tmp_path, "t3", "Renamed")
+    build_corpus(tmp_path, changed=["t3"])
+    after = {p.name: p.stat().st_ino for p in table_dir.iterdir()}
+    assert set(before) == set(after)
+    rewritten = {name for name in after if after[name] != before[name]}
+    assert "page-1.json" in rewritten
+    assert not rewritten & {"page-0.json", "page-2.json"}
+    assert len([n for n in rewritten if n.startswith("slots-")]) <= 1
+
+def test_corpus_removal_reuses_slot(tmp_path):
+    for i in range(4):
+        _add_tenant(tmp_path, f"t{i}", f"Person {i}")
+    build_corpus(tmp_path, page_size=2)
+    (tmp_path / "t0" / "resume.yaml").unlink()
+    result = build_corpus(tmp_path)
+    assert result["removed"] == ["t0"]
+    assert result["pages"] == [0]
+    assert "Person 0" not in (tmp_path / page_filename(0)).read_text()
+    _add_tenant(tmp_path, "new", "Newcomer")
+    result = build_corpus(tmp_path)
+    assert result["pages"] == [0]
+    assert "Newcomer" in (tmp_path / page_filename(0)).read_text()
+
+def test_corpus_shrinking_removes_trailing_pages(tmp_path):
+    for i in range(3):
+        _add_tenant(tmp_path, f"t{i}", f"Person {i}")
+    build_corpus(tmp_path, page_size=2)
+    (tmp_path / "t2" / "resume.yaml").unlink()
+    result = build_corpus(tmp_path)
+    assert result["pages"] == [0]
+    assert not (tmp_path / page_filename(1)).exists()
+    assert not (tmp_path / DIRECTORY_DIR / "page-1.json").exists()
+    assert 'rel="next"' not in (tmp_path / page_filename(0)).read_text()
+
+def test_corpus_rejects_invalid_before_rendering(tmp_path):
+    _add_tenant(tmp_path, "good", "Good")
+    (tmp_path / "bad").mkdir()
+    (tmp_path / "bad" / "resume.yaml").write_text("name: Bad\n")
+    result = build_corpus(tmp_path)
+    assert result["rendered"] == ["good"]
+    assert "location: required key is missing" in result["invalid"]["bad"]
+    assert not (tmp_path / "bad" / "index.html").exists()
+    assert "Bad" not in (tmp_path / page_filename(0)).read_text()
+
+def test_corpus_rejects_unknown_theme(tmp_path):
+    _add_tenant(tmp_path, "good", "Good")
+    _add_tenant(tmp_path, "fancy", "Fancy")
+    path = tmp_path / "fancy" / "resume.yaml"
+    path.write_text(path.read_text() + "theme: fancy\n")
+    result = build_corpus(tmp_path)
+    assert result["rendered"] == ["good"]
+    assert result["invalid"] == {"fancy": ["theme: unknown theme 'fancy'"]}
+    assert (tmp_path / DIRECTORY_DIR / "index.json").exists()
+
+def test_corpus_reverts_from_cli_theme(tmp_path):
+    _add_tenant(tmp_path, "a", "A")
+    register_theme("test-cli", CSS)
+    try:
+        build_corpus(tmp_path)
+        assert build_corpus(tmp_path, theme="test-cli")["rendered"] == ["a"]
+        assert build_corpus(tmp_path, theme="test-cli")["rendered"] == []
+        assert build_corpus(tmp_path)["rendered"] == ["a"]
+        assert build_corpus(tmp_path)["rendered"] == []
+    finally:
+        del THEMES["test-cli"]
+
+def test_corpus_parallel_load_with_shared_scheduler(tmp_path):
+    for i in range(70):
+        _add_tenant(tmp_path, f"t{i:02}", f"Person {i}")
+    with RenderScheduler(workers=2) as scheduler:
+        result = build_corpus(tmp_path, workers=2, scheduler=scheduler)
+    assert len(result["rendered"]) == 70
+
+def test_corpus_theme_change_rerenders(tmp_path):
+    _add_tenant(tmp_path, "a", "A")
+    build_corpus(tmp_path)
+    register_theme("test-corpus", CSS)
+    try:
+        result = build_corpus(tmp_path, theme="test-corpus")
+        assert result["rendered"] == ["a"]
+        assert result["pages"] == []
+    finally:
+        del THEMES["test-corpus"]
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Render scheduling
+# ═══════════════════════════════════════════════════════════════
+
+def _blocked_scheduler(**kwargs):
+    """Scheduler with one worker held inside the sink until release is set."""
+    order, started, release = [], threading.Event(), threading.Event()
+
+    def sink(outdir, html, md):
+        order.append(outdir)
+        started.set()
+        release.wait(5)
+
+    scheduler = RenderScheduler(workers=1, sink=sink, **kwargs)
+    scheduler.submit("busy", load_data())
+    assert started.wait(5)
+    return scheduler, order, release
+
+def test_scheduler_interactive_before_bulk():
+    scheduler, order, release = _blocked_scheduler()
+    data = load_data()
+    scheduler.submit("b1", data, BULK)
+    scheduler.submit("b2", data, BULK)
+    scheduler.submit("i1", data, INTERACTIVE)
+    assert scheduler.metrics()["depth"] == {"interactive": 1, "bulk": 2}
+    release.set()
+    scheduler.close()
+    assert order == ["busy", "i1", "b1", "b2"]
+    metrics = scheduler.metrics()
+    assert metrics["completed"] == 4
+    assert metrics["latency"]["interactive"]["count"] == 1
+    assert metrics["latency"]["bulk"]["count"] == 3
+
+def test_scheduler_coalesces_same_tenant():
+    scheduler, order, release = _blocked_scheduler()
+    data = load_data()
+    stale = scheduler.submit("t", data, BULK)
+    fresh = scheduler.submit("t", {**data, "name": "New"}, INTERACTIVE)
+    assert stale.cancelled()
+    release.set()
+    assert fresh.result(5) == "t"
+    scheduler.close()
+    assert order == ["busy", "t"]
+    assert scheduler.metrics()["coalesced"] == 1
+
+def test_scheduler_drops_expired_jobs():
+    scheduler, order, release = _blocked_scheduler()
+    expired = scheduler.submit("late", load_data(), deadline=0.0)
+    release.set()
+    scheduler.close()
+    assert expired.cancelled()
+    assert order == ["busy"]
+    assert scheduler.metrics()["expired"] == 1
+
+def test_scheduler_backpressure():
+    scheduler, order, release = _blocked_scheduler(maxsize=(1, 1))
+    scheduler.submit("a", load_data(), BULK)
+    try:
+        scheduler.submit("b", load_data(), BULK, timeout=0.05)
+    except queue.Full:
+        pass
+    else:
+        raise AssertionError("expected queue.Full")
+    scheduler.submit("c", load_data(), INTERACTIVE, timeout=0.05)
+    release.set()
+    scheduler.close()
+    assert order == ["busy", "c", "a"]
+
+def test_scheduler_reports_render_errors():
+    with RenderScheduler(workers=1, sink=lambda *args: None) as scheduler:
+        future = scheduler.submit("bad", {"name": "No contact"})
+        try:
+            future.result(5)
+        except KeyError:
+            pass
+        else:
+            raise AssertionError("expected KeyError")
+    assert scheduler.metrics()["failed"] == 1
+
+def test_scheduler_serialises_jobs_per_key():
+    names, started, release = [], threading.Event(), threading.Event()
+
+    def sink(outdir, html, md):
+        name = html.split('class="h-name">')[1].split("<")[0]
+        if name == "Old":
+            started.set()
+            release.wait(5)
+        names.append(name)
+
+    data = load_data()
+    with RenderScheduler(workers=2, sink=sink) as scheduler:
+        scheduler.submit("t", {**data, "name": "Old"})
+        assert started.wait(5)
+        fresh = scheduler.submit("t", {**data, "name": "New"}, INTERACTIVE)
+        assert scheduler.metrics()["depth"]["interactive"] == 1
+        release.set()
+        fresh.result(5)
+    assert names == ["Old", "New"]
+
+def test_scheduler_full_queue_keeps_older_job():
+    scheduler, order, release = _blocked_scheduler(maxsize=(1, 1))
+    scheduler.submit("a", load_data(), INTERACTIVE)
+    older = scheduler.submit("t", load_data(), BULK)
+    try:
+        scheduler.submit("t", load_data(), INTERACTIVE, timeout=0.05)
+    except queue.Full:
+        pass
+    else:
+        raise AssertionError("expected queue.Full")
+    assert not older.cancelled()
+    release.set()
+    scheduler.close()
+    assert order == ["busy", "a", "t"]
+    assert scheduler.metrics()["coalesced"] == 0
+
+def test_scheduler_replaces_job_in_full_class():
+    scheduler, order, release = _blocked_scheduler(maxsize=(1, 1))
+    older = scheduler.submit("t", load_data(), BULK)
+    scheduler.submit("t", load_data(), BULK, timeout=0.05)
+    assert older.cancelled()
+    release.set()
+    scheduler.close()
+    assert order == ["busy", "t"]
+
+def test_scheduler_theme_per_job():
+    register_theme("test-job", CSS.replace(".e-org", ".org-name"), {"e-org": "org-name"})
+    try:
+        pages = {}
+        with RenderScheduler(workers=1, sink=lambda o, html, md: pages.update({o: html})) as s:
+            s.submit("a", load_data(), theme="test-job")
+            s.submit("b", load_data())
+        assert 'class="org-name"' in pages["a"]
+        assert pages["b"] == GOLDEN_HTML
+    finally:
+        del THEMES["test-job"]
+
+def test_corpus_reports_render_failures(tmp_path):
+    _add_tenant(tmp_path, "a", "A")
+    _add_tenant(tmp_path, "b", "B")
+    (tmp_path / "a" / "index.html").mkdir()  # publishing over a directory fails
+    result = build_corpus(tmp_path)
+    assert list(result["failed"]) == ["a"]
+    assert result["failed"]["a"][0].startswith("render failed: ")
+    assert result["rendered"] == ["b"]
+    assert (tmp_path / DIRECTORY_DIR / "index.json").exists()
+
+def test_scheduler_writes_outputs(tmp_path):
+    with RenderScheduler(workers=2) as scheduler:
+        scheduler.submit(tmp_path, load_data()).result(5)
+    assert (tmp_path / "index.html").read_text() == GOLDEN_HTML
+    assert (tmp_path / "README.md").exists()
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Output store
+# ═══════════════════════════════════════════════════════════════
+
+def test_store_put_is_content_addressed(tmp_path):
+    store = OutputStore(tmp_path / "store")
+    digest = store.put(b"hello")
+    assert store.put(b"hello") == digest
+    blob = store.blob_path(digest)
+    assert blob.read_bytes() == b"hello"
+    assert blob.parent.name + blob.name == digest
+    assert blob.stat().st_mode & 0o777 == 0o444
+    assert store.stats["written"] == 1
+    assert store.stats["deduplicated"] == 1
+
+def test_store_publish_hardlinks_identical_outputs(tmp_path):
+    store = OutputStore(tmp_path / "store")
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    store.publish(tmp_path / "a" / "README.md", "same")
+    store.publish(tmp_path / "b" / "README.md", "same")
+    assert (tmp_path / "a" / "README.md").read_text() == "same"
+    assert os.path.samefile(tmp_path / "a" / "README.md", tmp_path / "b" / "README.md")
+    assert store.stats["written"] == 1
+
+def test_store_skips_unchanged_and_persists_manifest(tmp_path):
+    store = OutputStore(tmp_path / "store")
+    store.publish(tmp_path / "out.html", "v1")
+    store.save()
+    reopened = OutputStore(tmp_path / "store")
+    reopened.publish(tmp_path / "out.html", "v1")
+    assert reopened.stats == {"written": 0, "deduplicated": 0, "unchanged": 1}
+
+def test_store_republishes_externally_replaced_file(tmp_path):
+    store = OutputStore(tmp_path / "store")
+    out = tmp_path / "out.html"
+    store.publish(out, "v1")
+    out.unlink()
+    out.write_text("v2")
+    store.publish(out, "v1")
+    assert out.read_text() == "v1"
+    assert store.stats["unchanged"] == 0
+
+def _no_published_links(monkeypatch, err=errno.EXDEV):
+    """Make os.link fail for published paths, as across filesystems."""
+    real_link = os.link
+
+    def link(src, dst):
+        if "objects" not in str(dst):
+            raise OSError(err, os.strerror(err))
+        real_link(src, dst)
+
+    monkeypatch.setattr(os, "link", link)
+
+def test_store_copies_when_hardlinks_unavailable(tmp_path, monkeypatch):
+    _no_published_links(monkeypatch)
+    store = OutputStore(tmp_path / "store")
+    out = tmp_path / "out.html"
+    digest = store.publish(out, "v1")
+    assert out.read_text() == "v1"
+    assert not os.path.samefile(out, store.blob_path(digest))
+    assert store.blob_path(digest).read_text() == "v1"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.html", "store"]
+
+def test_store_skips_unchanged_copies(tmp_path, monkeypatch):
+    _no_published_links(monkeypatch)
+    store = OutputStore(tmp_path / "store")
+    out = tmp_path / "out.html"
+    store.publish(out, "v1")
+    store.publish(out, "v1")
+    assert store.stats["unchanged"] == 1
+    out.unlink()
+    out.write_text("v2")
+    store.publish(out, "v1")
+    assert out.read_text() == "v1"
+    assert store.stats["unchanged"] == 1
+
+def test_store_does_not_copy_on_other_link_errors(tmp_path, monkeypatch):
+    _no_published_links(monkeypatch, errno.EACCES)
+    store = OutputStore(tmp_path / "store")
+    try:
+        store.publish(tmp_path / "out.html", "v1")
+    except PermissionError:
+        pass
+    else:
+        raise AssertionError("expected PermissionError")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["store"]
+
+def test_store_failed_publish_leaves_no_temp_file(tmp_path):
+    store = OutputStore(tmp_path / "store")
+    (tmp_path / "out.html").mkdir()
+    try:
+        store.publish(tmp_path / "out.html", "v1")
+    except OSError:
+        pass
+    else:
+        raise AssertionError("expected OSError")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.html", "store"]
+
+def test_store_gc_removes_unreferenced_blobs(tmp_path):
+    store = OutputStore(tmp_path / "store")
+    old = store.publish(tmp_path / "out.html", "v1")
+    new = store.publish(tmp_path / "out.html", "v2")
+    store.publish(tmp_path / "gone.html", "v3")
+    gone = store.manifest[str(tmp_path / "gone.html")][0]
+    (tmp_path / "gone.html").unlink()
+    assert store.gc() == 4
+    assert not store.blob_path(old).exists()
+    assert not store.blob_path(gone).exists()
+    assert store.blob_path(new).exists()
+    assert (tmp_path / "out.html").read_text() == "v2"
+
+def test_store_concurrent_puts_keep_one_blob(tmp_path):
+    store = OutputStore(tmp_path / "store")
+    for i in range(8):
+        (tmp_path / str(i)).mkdir()
+    threads = [
+        threading.Thread(target=store.publish, args=(tmp_path / str(i) / "out.html", "same"))
+        for i in range(8)
+    ]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    for i in range(1, 8):
+        assert os.path.samefile(tmp_path / "0" / "out.html", tmp_path / str(i) / "out.html")
+    assert store.stats["written"] == 1
+
+def test_store_gc_skips_temp_files(tmp_path):
+    store = OutputStore(tmp_path / "store")
+    digest = store.put(b"x")
+    tmp = store.blob_path(digest).parent / ".tmp-inflight"
+    tmp.write_bytes(b"partial")
+    store.gc()
+    assert tmp.exists()
+
+def test_corpus_deduplicates_cloned_tenants(tmp_path):
+    _add_tenant(tmp_path, "a", "Clone")
+    _add_tenant(tmp_path, "b", "Clone")
+    build_corpus(tmp_path)
+    assert os.path.samefile(tmp_path / "a" / "index.html", tmp_path / "b" / "index.html")
+    assert os.path.samefile(tmp_path / "a" / "README.md", tmp_path / "b" / "README.md")
+    assert (tmp_path / STORE_DIR / "manifest.json").exists()
+
+def test_corpus_removal_unpublishes_outputs(tmp_path):
+    _add_tenant(tmp_path, "a", "A")
+    _add_tenant(tmp_path, "b", "B")
+    build_corpus(tmp_path)
+    store = OutputStore(tmp_path / STORE_DIR)
+    blob = store.blob_path(store.manifest[str(tmp_path / "a" / "index.html")][0])
+    (tmp_path / "a" / "resume.yaml").unlink()
+    build_corpus(tmp_path)
+    assert not (tmp_path / "a" / "index.html").exists()
+    assert not (tmp_path / "a" / "README.md").exists()
+    assert (tmp_path / "b" / "index.html").exists()
+    store = OutputStore(tmp_path / STORE_DIR)
+    assert str(tmp_path / "a" / "index.html") not in store.manifest
+    assert store.gc() > 0
+    assert not blob.exists()
+
+def test_corpus_shared_scheduler_publishes_through_store(tmp_path):
+    _add_tenant(tmp_path, "a", "Clone")
+    _add_tenant(tmp_path, "b", "Clone")
+    store = OutputStore(tmp_path / "store")
+    with RenderScheduler(workers=2) as scheduler:
+        build_corpus(tmp_path, scheduler=scheduler, store=store)
+    assert os.path.samefile(tmp_path / "a" / "index.html", tmp_path / "b" / "index.html")
+    assert str(tmp_path / "a" / "index.html") in store.manifest
+
+
 # ═══════════════════════════════════════════════════════════════
 #  build.py CLI integration
 # ═══════════════════════════════════════════════════════════════
@@ -318,6 +930,27 @@ def test_build_script_runs_cleanly():
     assert "Wrote index.html" in result.stdout
     assert "Wrote README.md" in result.stdout
 
+def test_corpus_check_rejects_unknown_theme(tmp_path):
+    _add_tenant(tmp_path, "a", "A")
+    path = tmp_path / "a" / "resume.yaml"
+    path.write_text(path.read_text() + "theme: fancy\n")
+    result = subprocess.run(
+        ["python3", "build.py", "--corpus", str(tmp_path), "--check"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 1
+    assert "theme: unknown theme 'fancy'" in result.stderr
+    assert "1 invalid" in result.stdout
+    ok = subprocess.run(
+        ["python3", "build.py", "--corpus", str(tmp_path), "--check", "--theme", "default"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    assert ok.returncode == 0, ok.stderr
+
 def test_build_output_files_exist():
     subprocess.run(["python3", "build.py"], cwd=ROOT, check=True)
     assert (ROOT / "index.html").exists()